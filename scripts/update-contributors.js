@@ -12,27 +12,54 @@ const path = require('path');
 const REPO_OWNER = 'broadsage';
 const REPO_NAME = 'scorecard-action';
 const CONTRIBUTORS_FILE = path.join(__dirname, '../CONTRIBUTORS.md');
+const START_MARKER = '<!-- CONTRIBUTORS_START -->';
+const END_MARKER = '<!-- CONTRIBUTORS_END -->';
+// Contributors table layout
+const CONTRIBUTORS_PER_ROW = 4;
+const AVATAR_SIZE = 100;
+// Contribution badges by minimum commit count: [minCommits, badge, external contributor badge]
+const CONTRIBUTION_LEVELS = Object.freeze([
+  [100, '🏆 Core Maintainer', '🏆 Core Maintainer'],
+  [50, '⭐ Major Contributor', '⭐ Major Community Contributor'],
+  [20, '🌟 Active Contributor', '🌟 Active Community Contributor'],
+  [10, '✨ Regular Contributor', '✨ Regular Community Contributor'],
+  [5, '🚀 Contributor', '🚀 Community Contributor'],
+  [0, '� New Contributor', '� New Community Contributor']
+].map(Object.freeze));
+// Reuse TLS connections to api.github.com across all requests
+const GITHUB_AGENT = new https.Agent({ keepAlive: true, maxSockets: 10 });
+const GITHUB_HEADERS = Object.freeze({
+  'User-Agent': 'scorecard-action-release-script',
+  'Accept': 'application/vnd.github.v3+json'
+});
+const GITHUB_REQUEST_TEMPLATE = Object.freeze({
+  hostname: 'api.github.com',
+  method: 'GET',
+  agent: GITHUB_AGENT
+});
+// Back off between attempts on network errors, timeouts, throttling and server errors
+const RETRY_DELAYS_MS = Object.freeze([300, 1000, 3000]);
+const RETRYABLE_STATUSES = new Set([429, 500, 502, 503, 504]);
+const REQUEST_TIMEOUT_MS = 30000;
+// Longest rate-limit wait worth sitting out; anything longer fails the run instead
+const MAX_RATE_LIMIT_WAIT_MS = 60000;
+// Owner lookup plus contributors and the three membership listings at a few pages each,
+// with every call allowed its full set of retry attempts
+const EXPECTED_PAGES_PER_LISTING = 3;
+const MIN_REQUIRED_REQUESTS = (1 + 4 * EXPECTED_PAGES_PER_LISTING) * (RETRY_DELAYS_MS.length + 1);
 
 /**
- * Make GitHub API request
+ * Send a single GitHub API request
  */
-function makeGitHubRequest(path, authToken = null) {
+function sendGitHubRequest(path, authToken = null) {
   return new Promise((resolve, reject) => {
     const options = {
-      hostname: 'api.github.com',
+      ...GITHUB_REQUEST_TEMPLATE,
       path: path,
-      method: 'GET',
-      headers: {
-        'User-Agent': 'scorecard-action-release-script',
-        'Accept': 'application/vnd.github.v3+json'
-      }
+      // Add authorization if token is available
+      headers: authToken ? { ...GITHUB_HEADERS, 'Authorization': `token ${authToken}` } : GITHUB_HEADERS
     };
 
-    // Add authorization if token is available
-    if (authToken) {
-      options.headers['Authorization'] = `token ${authToken}`;
-    }
-
     const req = https.request(options, (res) => {
       let data = '';
       res.on('data', (chunk) => {
@@ -41,13 +68,17 @@ function makeGitHubRequest(path, authToken = null) {
       res.on('end', () => {
         try {
           const result = JSON.parse(data);
-          resolve({ data: result, status: res.statusCode });
+          resolve({ data: result, status: res.statusCode, headers: res.headers });
         } catch (error) {
           reject(error);
         }
       });
     });
 
+    req.setTimeout(REQUEST_TIMEOUT_MS, () => {
+      req.destroy(new Error(`timeout after ${REQUEST_TIMEOUT_MS}ms`));
+    });
+
     req.on('error', (error) => {
       reject(error);
     });
@@ -56,6 +87,120 @@ function makeGitHubRequest(path, authToken = null) {
   });
 }
 
+/**
+ * Work out how long to wait before retrying a response, or null if it should not be retried
+ */
+function getRetryDelay(response, attempt) {
+  const backoff = RETRY_DELAYS_MS[attempt];
+  if (backoff === undefined) {
+    return null;
+  }
+
+  const { 'retry-after': retryAfter, 'x-ratelimit-remaining': remaining, 'x-ratelimit-reset': reset } = response.headers;
+  let delay = null;
+
+  // Secondary rate limits (403 or 429) say when to come back via Retry-After
+  if (retryAfter !== undefined && (response.status === 403 || response.status === 429)) {
+    delay = Number(retryAfter) * 1000;
+  } else if (remaining === '0' && reset !== undefined && (response.status === 403 || response.status === 429)) {
+    // Primary rate limit exhausted, wait for the window to reset
+    delay = Number(reset) * 1000 - Date.now();
+  } else if (RETRYABLE_STATUSES.has(response.status)) {
+    return backoff;
+  } else {
+    return null;
+  }
+
+  if (!Number.isFinite(delay) || delay > MAX_RATE_LIMIT_WAIT_MS) {
+    return null;
+  }
+  return Math.max(delay, backoff);
+}
+
+/**
+ * Make GitHub API request, retrying transient failures with backoff
+ */
+async function makeGitHubRequest(path, authToken = null) {
+  for (let attempt = 0; ; attempt++) {
+    let retryDelay;
+
+    try {
+      const response = await sendGitHubRequest(path, authToken);
+      retryDelay = getRetryDelay(response, attempt);
+      if (retryDelay === null) {
+        return response;
+      }
+      console.warn(`⚠️ GitHub API returned ${response.status} for ${path}, retrying in ${retryDelay}ms`);
+    } catch (error) {
+      retryDelay = RETRY_DELAYS_MS[attempt];
+      if (retryDelay === undefined) {
+        throw error;
+      }
+      console.warn(`⚠️ GitHub API request for ${path} failed (${error.message}), retrying in ${retryDelay}ms`);
+    }
+
+    await new Promise(resolve => setTimeout(resolve, retryDelay));
+  }
+}
+
+/**
+ * Fetch every page of a GitHub list endpoint
+ */
+async function fetchAllPages(path, authToken = null) {
+  const items = [];
+  const separator = path.includes('?') ? '&' : '?';
+
+  for (let page = 1; ; page++) {
+    const response = await makeGitHubRequest(`${path}${separator}per_page=100&page=${page}`, authToken);
+    if (response.status !== 200 || !Array.isArray(response.data)) {
+      throw new Error(`GitHub API returned ${response.status} for ${path}`);
+    }
+
+    items.push(...response.data);
+    if (response.data.length < 100) {
+      return items;
+    }
+  }
+}
+
+/**
+ * Fetch a list of users, empty on failure
+ */
+async function fetchUserList(path, authToken = null) {
+  try {
+    return await fetchAllPages(path, authToken);
+  } catch (error) {
+    console.warn(`⚠️ Could not list ${path}:`, error.message);
+    return [];
+  }
+}
+
+/**
+ * Index users by lowercase login
+ */
+function toLoginSet(users) {
+  return new Set(users.map(user => user.login.toLowerCase()));
+}
+
+/**
+ * Make sure enough core API budget is left for a full run (the /rate_limit call itself is free)
+ */
+async function checkRateBudget(authToken = null) {
+  let core;
+  try {
+    const response = await makeGitHubRequest('/rate_limit', authToken);
+    core = response.data.resources.core;
+  } catch (error) {
+    console.warn('⚠️ Could not check GitHub API rate limit:', error.message);
+    return;
+  }
+
+  if (core.remaining < MIN_REQUIRED_REQUESTS) {
+    const resetAt = new Date(core.reset * 1000).toISOString();
+    throw new Error(`GitHub API rate limit nearly exhausted (${core.remaining}/${core.limit} left, resets at ${resetAt})`);
+  }
+}
+
 /**
  * Check repository owner type and get owner info
  */
@@ -73,56 +218,50 @@ async function getRepositoryOwnerInfo(authToken = null) {
   }
 }
 
+/**
+ * Fetch organization members, owners and repository collaborators in one batch
+ */
+async function getMembershipIndex(ownerInfo, authToken = null) {
+  const [orgMembers, orgAdmins, collaborators] = await Promise.all([
+    ownerInfo.isOrganization ? fetchUserList(`/orgs/${REPO_OWNER}/members`, authToken) : [],
+    ownerInfo.isOrganization ? fetchUserList(`/orgs/${REPO_OWNER}/members?role=admin`, authToken) : [],
+    fetchUserList(`/repos/${REPO_OWNER}/${REPO_NAME}/collaborators`, authToken)
+  ]);
+
+  // Admin access likely means an org owner with private membership
+  const repoAdmins = ownerInfo.isOrganization
+    ? collaborators.filter(user => user.permissions && user.permissions.admin)
+    : [];
+
+  return {
+    orgMembers: toLoginSet(orgMembers),
+    orgAdmins: toLoginSet(orgAdmins),
+    collaborators: toLoginSet(collaborators),
+    repoAdmins: toLoginSet(repoAdmins)
+  };
+}
+
 /**
  * Check if user is organization member or owner (only for organization repos)
  */
-async function checkOrganizationMembership(username, ownerInfo, authToken = null) {
-  if (!ownerInfo.isOrganization) {
-    return { isMember: false, role: null }; // Not an organization, so no org membership
+function checkOrganizationMembership(username, membershipIndex) {
+  const login = username.toLowerCase();
+
+  if (membershipIndex.orgAdmins.has(login) || membershipIndex.repoAdmins.has(login)) {
+    return { isMember: true, role: 'admin' };
   }
-  
-  try {
-    // First try public membership
-    const response = await makeGitHubRequest(`/orgs/${REPO_OWNER}/members/${username}`, authToken);
-    if (response.status === 204) {
-      // Check if they're an owner by checking their role
-      try {
-        const membershipResponse = await makeGitHubRequest(`/orgs/${REPO_OWNER}/memberships/${username}`, authToken);
-        const role = membershipResponse.data.role; // 'admin' or 'member'
-        return { isMember: true, role: role };
-      } catch {
-        return { isMember: true, role: 'member' }; // Default to member if we can't get role
-      }
-    }
-  } catch (error) {
-    // If we get 404, user might have private membership or not be a member
-    // Try checking repository permissions to infer organization relationship
-    try {
-      const repoResponse = await makeGitHubRequest(`/repos/${REPO_OWNER}/${REPO_NAME}/collaborators/${username}/permission`, authToken);
-      const permission = repoResponse.data.permission;
-      
-      if (permission === 'admin') {
-        // Admin access likely means they're org owner with private membership
-        return { isMember: true, role: 'admin' };
-      }
-    } catch {
-      // No special permissions found
-    }
+  if (membershipIndex.orgMembers.has(login)) {
+    return { isMember: true, role: 'member' };
   }
-  
+
   return { isMember: false, role: null };
 }
 
 /**
  * Check if user is repository collaborator
  */
-async function checkCollaboratorStatus(username, authToken = null) {
-  try {
-    const response = await makeGitHubRequest(`/repos/${REPO_OWNER}/${REPO_NAME}/collaborators/${username}`, authToken);
-    return response.status === 204; // 204 means user is a collaborator
-  } catch (error) {
-    return false;
-  }
+function checkCollaboratorStatus(username, membershipIndex) {
+  return membershipIndex.collaborators.has(username.toLowerCase());
 }
 
 /**
@@ -137,23 +276,29 @@ function isRepositoryOwner(username, ownerInfo) {
  */
 async function fetchContributors() {
   try {
-    const authToken = process.env.GITHUB_TOKEN;
+    const authToken = process.env.GITHUB_TOKEN || process.env.GH_TOKEN;
     
-    // First, get repository owner information
-    const ownerInfo = await getRepositoryOwnerInfo(authToken);
-    console.log(`📋 Repository owned by: ${ownerInfo.login} (${ownerInfo.type})`);
+    // Bail out before doing any work if the run cannot complete
+    await checkRateBudget(authToken);
     
-    const response = await makeGitHubRequest(`/repos/${REPO_OWNER}/${REPO_NAME}/contributors`, authToken);
-    const contributors = response.data;
+    // Owner information and the contributor list are independent, fetch them together
+    const [ownerInfo, contributors] = await Promise.all([
+      getRepositoryOwnerInfo(authToken),
+      fetchAllPages(`/repos/${REPO_OWNER}/${REPO_NAME}/contributors`, authToken)
+    ]);
+    console.log(`📋 Repository owned by: ${ownerInfo.login} (${ownerInfo.type})`);
     
     console.log(`🔍 Checking membership status for ${contributors.length} contributors...`);
     
+    // List members and collaborators once instead of querying per contributor
+    const membershipIndex = await getMembershipIndex(ownerInfo, authToken);
+    
     // Enhance each contributor with membership info
     for (const contributor of contributors) {
       if (contributor.type === 'User') {
         const isOwner = isRepositoryOwner(contributor.login, ownerInfo);
-        const orgMembership = await checkOrganizationMembership(contributor.login, ownerInfo, authToken);
-        const isCollaborator = await checkCollaboratorStatus(contributor.login, authToken);
+        const orgMembership = checkOrganizationMembership(contributor.login, membershipIndex);
+        const isCollaborator = checkCollaboratorStatus(contributor.login, membershipIndex);
         
         contributor.isOwner = isOwner;
         contributor.isOrgMember = orgMembership.isMember;
@@ -191,26 +336,51 @@ function getMembershipType(isOwner, isOrgMember, orgRole, isCollaborator, isOrgR
   }
 }
 
+/**
+ * Read CONTRIBUTORS.md, failing if the generated section markers are missing
+ */
+function readContributorsFile() {
+  const content = fs.readFileSync(CONTRIBUTORS_FILE, 'utf8');
+  
+  if (!content.includes(START_MARKER) || !content.includes(END_MARKER)) {
+    throw new Error(`CONTRIBUTORS.md is missing the ${START_MARKER} / ${END_MARKER} markers`);
+  }
+  
+  return content;
+}
+
 /**
  * Update CONTRIBUTORS.md file
  */
 function updateContributorsFile(contributors) {
   try {
-    let content = fs.readFileSync(CONTRIBUTORS_FILE, 'utf8');
+    let content = readContributorsFile();
     
     // Generate beautiful contributors section
     const contributorsTable = generateContributorsTable(contributors);
 
     // Update content between markers
-    const startMarker = '<!-- CONTRIBUTORS_START -->';
-    const endMarker = '<!-- CONTRIBUTORS_END -->';
-    
-    const beforeMarker = content.substring(0, content.indexOf(startMarker) + startMarker.length);
-    const afterMarker = content.substring(content.indexOf(endMarker));
+    const beforeMarker = content.substring(0, content.indexOf(START_MARKER) + START_MARKER.length);
+    const afterMarker = content.substring(content.indexOf(END_MARKER));
     
     const updatedContent = `${beforeMarker}\n${contributorsTable}\n${afterMarker}`;
     
-    fs.writeFileSync(CONTRIBUTORS_FILE, updatedContent, 'utf8');
+    // Leave the file (and its mtime) alone when nothing changed
+    if (updatedContent === content) {
+      console.log(`✅ CONTRIBUTORS.md already up to date with ${contributors.length} contributors`);
+      return true;
+    }
+    
+    // Write to a sibling temp file and rename so an interrupted run never leaves a partial file
+    const tempFile = `${CONTRIBUTORS_FILE}.tmp`;
+    try {
+      fs.writeFileSync(tempFile, updatedContent, 'utf8');
+      fs.renameSync(tempFile, CONTRIBUTORS_FILE);
+    } catch (error) {
+      // Don't leave a stray temp file in the working tree
+      fs.rmSync(tempFile, { force: true });
+      throw error;
+    }
     console.log(`✅ Updated CONTRIBUTORS.md with ${contributors.length} contributors`);
     
     return true;
@@ -225,11 +395,19 @@ function updateContributorsFile(contributors) {
  */
 function generateContributorStats(contributors) {
   const totalContributors = contributors.length;
-  const owners = contributors.filter(c => c.membershipType === 'Repository Owner' || c.membershipType === 'Organization Owner').length;
-  const orgMembers = contributors.filter(c => c.membershipType === 'Organization Member').length;
-  const externalCollaborators = contributors.filter(c => c.membershipType === 'External Collaborator').length;
-  const externalContributors = contributors.filter(c => c.membershipType === 'External Contributor').length;
-  const totalCommits = contributors.reduce((sum, c) => sum + c.contributions, 0);
+  const counts = {};
+  let totalCommits = 0;
+
+  // Tally membership types and commits in a single pass
+  for (const contributor of contributors) {
+    counts[contributor.membershipType] = (counts[contributor.membershipType] || 0) + 1;
+    totalCommits += contributor.contributions;
+  }
+
+  const owners = (counts['Repository Owner'] || 0) + (counts['Organization Owner'] || 0);
+  const orgMembers = counts['Organization Member'] || 0;
+  const externalCollaborators = counts['External Collaborator'] || 0;
+  const externalContributors = counts['External Contributor'] || 0;
 
   let stats = `### 📊 Contributor Statistics
 
@@ -271,73 +449,43 @@ function generateContributorsTable(contributors) {
   // Generate statistics
   const stats = generateContributorStats(userContributors);
   
-  let table = `\n${stats}\n\n<table>\n<tr>\n`;
+  const parts = [`\n${stats}\n\n<table>\n<tr>\n`];
   
-  // Generate table rows (4 contributors per row)
+  // Generate table rows (CONTRIBUTORS_PER_ROW contributors per row)
   userContributors.forEach((contributor, index) => {
-    if (index > 0 && index % 4 === 0) {
-      table += '</tr>\n<tr>\n';
+    if (index > 0 && index % CONTRIBUTORS_PER_ROW === 0) {
+      parts.push('</tr>\n<tr>\n');
     }
     
     const contributionBadge = getContributionBadge(contributor.contributions, contributor.membershipType);
-    const avatarSize = 100;
     
-    table += `  <td align="center" valign="top" width="25%">
+    parts.push(`  <td align="center" valign="top" width="25%">
     <a href="${contributor.html_url}">
-      <img src="${contributor.avatar_url}" width="${avatarSize}" height="${avatarSize}" alt="${contributor.login}"/><br />
+      <img src="${contributor.avatar_url}" width="${AVATAR_SIZE}" height="${AVATAR_SIZE}" alt="${contributor.login}"/><br />
       <sub><b>${contributor.login}</b></sub>
     </a><br />
     <sub>${contributionBadge}</sub><br />
     <sub>${contributor.contributions} commits</sub>
-  </td>\n`;
+  </td>\n`);
   });
   
   // Close the final row
-  table += '</tr>\n</table>\n';
+  parts.push('</tr>\n</table>\n');
   
-  return table;
-}
-
-/**
- * Get membership badge based on status
- */
-function getMembershipBadge(membershipType) {
-  switch (membershipType) {
-    case 'Repository Owner':
-      return '👑 Repository Owner';
-    case 'Organization Owner':
-      return '👑 Organization Owner';
-    case 'Organization Member':
-      return '🏢 Organization Member';
-    case 'External Collaborator':
-      return '🤝 External Collaborator';
-    case 'External Contributor':
-      return '🌍 External Contributor';
-    default:
-      return '👤 Contributor';
-  }
+  return parts.join('');
 }
 
 /**
  * Get contribution badge based on commit count and membership
  */
 function getContributionBadge(commits, membershipType = null) {
-  let badge = '';
-  
   // Determine contribution level
-  if (commits >= 100) badge = '🏆 Core Maintainer';
-  else if (commits >= 50) badge = '⭐ Major Contributor';
-  else if (commits >= 20) badge = '🌟 Active Contributor';
-  else if (commits >= 10) badge = '✨ Regular Contributor';
-  else if (commits >= 5) badge = '🚀 Contributor';
-  else badge = '� New Contributor';
+  // Missing or non-numeric counts fall through to the lowest level
+  const level = CONTRIBUTION_LEVELS.find(([minCommits]) => commits >= minCommits)
+    || CONTRIBUTION_LEVELS[CONTRIBUTION_LEVELS.length - 1];
   
   // Add membership context for non-org members
-  if (membershipType === 'External Contributor') {
-    badge = badge.replace('Contributor', 'Community Contributor');
-  }
-  
-  return badge;
+  return membershipType === 'External Contributor' ? level[2] : level[1];
 }
 
 /**
@@ -345,6 +493,9 @@ function getContributionBadge(commits, membershipType = null) {
  */
 async function main() {
   try {
+    // Check the target file before spending any API calls on it
+    readContributorsFile();
+    
     console.log('🔄 Fetching contributors from GitHub API...');
     const contributors = await fetchContributors();
     
@@ -361,6 +512,10 @@ async function main() {
     }
   } catch (error) {
     console.error('❌ Error:', error.message);
+    // Full stack traces only when the workflow runs with debug logging
+    if (process.env.RUNNER_DEBUG === '1') {
+      console.error(error.stack);
+    }
     process.exit(1);
   }
 }